@@ -1,15 +1,41 @@
 import os
+import numpy as np
 import pandas as pd
-import plotly.express as px
-from dash import Dash, dcc, html, Input, Output
+import plotly.graph_objects as go
+from dash import Dash, dcc, html, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
 import calendar
 
 # === Load & Prepare Data ===
-def load_and_prepare_data(filepath, label):
+def empty_data():
+    """Empty frame with the same columns and dtypes as prepared data"""
+    return pd.DataFrame({
+        'REGION': pd.Series(dtype='string'),
+        'DAY_OF_MONTH': pd.Series(dtype='uint8'),
+        'YEAR': pd.Series(dtype='uint16'),
+        'MONTH_NUM': pd.Series(dtype='uint8')
+    })
+
+def load_and_prepare_data(filepath):
     """Load and prepare data from Excel file with error handling"""
+    # Bump the tag whenever the prepared columns, dtypes or filters change
+    cache = filepath + '.v2.parquet'
     try:
-        df = pd.read_excel(filepath)
+        # Reuse the parsed data while it is newer than the Excel file
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(filepath):
+            try:
+                df = pd.read_parquet(cache, engine='pyarrow')
+                print(f"Loaded {len(df)} cached records for {filepath}")
+                return df
+            except Exception as e:
+                print(f"Warning: Could not read cache {cache}, re-parsing: {str(e)}")
+
+        df = pd.read_excel(
+            filepath,
+            engine='calamine',
+            usecols=['APPLICATION DATE', 'REGION', 'Status'],
+            dtype={'REGION': 'string', 'Status': 'category'}
+        )
         df['APPLICATION DATE'] = pd.to_datetime(
             df['APPLICATION DATE'], 
             format='%d.%m.%Y %H:%M:%S', 
@@ -17,44 +43,92 @@ def load_and_prepare_data(filepath, label):
             errors='coerce'
         )
         df = df.dropna(subset=['APPLICATION DATE', 'REGION', 'Status'])
-        df = df[df['Status'].str.strip().str.lower() == 'paid']
+        # Normalise each distinct status once, then match rows by category code
+        statuses = df['Status'].cat.categories
+        paid_codes = [i for i, c in enumerate(statuses) if str(c).strip().lower() == 'paid']
+        df = df[np.isin(df['Status'].cat.codes.to_numpy(), paid_codes)]
 
-        df['DAY_OF_MONTH'] = df['APPLICATION DATE'].dt.day
-        df['YEAR'] = df['APPLICATION DATE'].dt.year
-        df['MONTH_NUM'] = df['APPLICATION DATE'].dt.month
-        df['SOURCE'] = label
+        # Split the dates with datetime64 unit casts instead of three .dt scans
+        days = df['APPLICATION DATE'].to_numpy(dtype='datetime64[D]')
+        month_starts = days.astype('datetime64[M]')
+        month_index = month_starts.astype(np.int64)
+        df['DAY_OF_MONTH'] = ((days - month_starts).astype(np.int64) + 1).astype('uint8')
+        df['YEAR'] = (month_index // 12 + 1970).astype('uint16')
+        df['MONTH_NUM'] = (month_index % 12 + 1).astype('uint8')
+        df = df[['REGION', 'DAY_OF_MONTH', 'YEAR', 'MONTH_NUM']]
+
+        # Write beside the cache and swap it in, so readers never see a partial file
+        tmp_cache = f"{cache}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_cache, engine='pyarrow', compression='snappy')
+            os.replace(tmp_cache, cache)
+        except Exception as e:
+            print(f"Warning: Could not write cache {cache}: {str(e)}")
+            if os.path.exists(tmp_cache):
+                os.remove(tmp_cache)
 
         print(f"Successfully loaded {len(df)} records from {filepath}")
         return df
 
     except FileNotFoundError:
         print(f"Warning: File {filepath} not found. Creating empty DataFrame.")
-        return pd.DataFrame(columns=[
-            'APPLICATION DATE', 'REGION', 'Status', 
-            'DAY_OF_MONTH', 'YEAR', 'MONTH_NUM', 'SOURCE'
-        ])
+        return empty_data()
     except Exception as e:
         print(f"Error loading {filepath}: {str(e)}")
-        return pd.DataFrame(columns=[
-            'APPLICATION DATE', 'REGION', 'Status', 
-            'DAY_OF_MONTH', 'YEAR', 'MONTH_NUM', 'SOURCE'
-        ])
+        return empty_data()
 
 # === Load Your Excel Files ===
 print("Loading data files...")
-df_2024 = load_and_prepare_data('10.xlsx', '2024')
-df_2025 = load_and_prepare_data('univeristy - 24-6.xlsx', '2025')
+df_2024 = load_and_prepare_data('10.xlsx')
+df_2025 = load_and_prepare_data('univeristy - 24-6.xlsx')
 
 df_combined = pd.concat([df_2024, df_2025], ignore_index=True)
+df_combined['REGION'] = df_combined['REGION'].astype('category')
+region_to_code = {r: i for i, r in enumerate(df_combined['REGION'].cat.categories)}
 
 if df_combined.empty:
     print("Warning: No data loaded. Using placeholder data.")
     regions = ['No Data Available']
 else:
-    regions = sorted(df_combined['REGION'].unique())
+    regions = list(df_combined['REGION'].cat.categories)
     print(f"Data loaded successfully. Found {len(regions)} regions.")
 
 months = [{'label': calendar.month_name[m], 'value': m} for m in range(1, 13)]
+MONTH_NAMES = np.array([''] + [calendar.month_name[m] for m in range(1, 13)])
+
+# === Precompute Daily Aggregates ===
+# Chart traces for each (region, month); region None means all regions
+AGG_CACHE = {}
+region_codes = df_combined['REGION'].cat.codes.to_numpy().astype(np.int64)
+month_index = df_combined['MONTH_NUM'].to_numpy().astype(np.int64) - 1
+day_index = df_combined['DAY_OF_MONTH'].to_numpy().astype(np.int64) - 1
+year_codes, years = pd.factorize(df_combined['YEAR'], sort=True)
+n_regions = len(region_to_code)
+n_years = len(years)
+
+def daily_traces(counts, month):
+    """Split a 31 x n_years grid of counts into one labelled trace per year"""
+    traces = []
+    for y, year in enumerate(years):
+        days = np.flatnonzero(counts[:, y])
+        if days.size:
+            traces.append({
+                'x': (days + 1).tolist(),
+                'y': counts[days, y].tolist(),
+                'name': f"{MONTH_NAMES[month]} {year}"
+            })
+    return traces
+
+# Every key is a small fixed range, so one bincount over a fused key
+# fills the whole region x month x day x year grid in a single pass
+key = ((region_codes * 12 + month_index) * 31 + day_index) * n_years + year_codes
+counts = np.bincount(key, minlength=n_regions * 12 * 31 * n_years)
+counts = counts.reshape(n_regions, 12, 31, n_years)
+all_region_counts = counts.sum(axis=0)
+for m in range(1, 13):
+    for region, code in region_to_code.items():
+        AGG_CACHE[(region, m)] = daily_traces(counts[code, m - 1], m)
+    AGG_CACHE[(None, m)] = daily_traces(all_region_counts[m - 1], m)
 
 # === Dash App Initialization ===
 app = Dash(
@@ -68,6 +142,45 @@ server = app.server  # Ensure this line is present
 
 app.title = "Application Analytics Dashboard"
 
+# === Chart Styling ===
+# Styling shared by every figure, built once instead of per callback
+MESSAGE_LAYOUT = dict(
+    plot_bgcolor="white",
+    font=dict(size=14),
+    title_font_size=18,
+    height=500
+)
+BASE_LAYOUT = dict(
+    xaxis=dict(
+        tickmode='linear',
+        dtick=1,
+        title='Day of Month',
+        showgrid=True,
+        gridwidth=1,
+        gridcolor='lightgray'
+    ),
+    yaxis=dict(
+        title='Total Paid Applications',
+        showgrid=True,
+        gridwidth=1,
+        gridcolor='lightgray'
+    ),
+    plot_bgcolor="white",
+    font=dict(size=12),
+    title_font_size=16,
+    hovermode="x unified",
+    showlegend=True,
+    legend_title_text='Period',
+    height=500,
+    margin=dict(l=50, r=50, t=80, b=50)
+)
+
+# Full Plotly layouts, default template included, sent once with the page
+CHART_LAYOUTS = {
+    'base': go.Figure(layout=BASE_LAYOUT).to_dict()['layout'],
+    'message': go.Figure(layout=MESSAGE_LAYOUT).to_dict()['layout']
+}
+
 # === Layout ===
 app.layout = dbc.Container([
     dbc.Row([
@@ -108,7 +221,9 @@ app.layout = dbc.Container([
             dcc.Graph(
                 id='line-chart',
                 style={'height': '600px'}
-            )
+            ),
+            dcc.Store(id='chart-layouts', data=CHART_LAYOUTS),
+            dcc.Store(id='trace-data')
         ])
     ]),
     html.Hr(),
@@ -118,101 +233,49 @@ app.layout = dbc.Container([
     )
 ], fluid=True, className="py-4")
 
-# === Callback ===
-@app.callback(
-    Output('line-chart', 'figure'),
-    Input('region-filter', 'value'),
-    Input('month-filter', 'value'),
-)
-def update_chart(selected_region, selected_month):
+# === Chart Data ===
+def make_chart_data(selected_region, selected_month):
+    """Return the title, day range and per-year traces for the chart"""
     if df_combined.empty:
-        fig = px.line(title="No data available. Please check your Excel files.")
-        fig.update_layout(
-            plot_bgcolor="white",
-            font=dict(size=14),
-            title_font_size=18,
-            height=500
-        )
-        return fig
-    
-    dff = df_combined.copy()
-
-    if selected_region:
-        dff = dff[dff['REGION'] == selected_region]
-
-    if selected_month:
-        dff = dff[dff['MONTH_NUM'] == selected_month]
-    else:
-        fig = px.line(title="Please select a month to display data.")
-        fig.update_layout(
-            plot_bgcolor="white",
-            font=dict(size=14),
-            title_font_size=18,
-            height=500
-        )
-        return fig
+        return {'title': "No data available. Please check your Excel files."}
+
+    if not selected_month:
+        return {'title': "Please select a month to display data."}
+
+    traces = AGG_CACHE.get((selected_region or None, selected_month))
 
-    if dff.empty:
+    if not traces:
         title = f"No data available for the selected filters"
         if selected_region and selected_month:
             title += f": {selected_region} in {calendar.month_name[selected_month]}"
-        fig = px.line(title=title)
-        fig.update_layout(
-            plot_bgcolor="white",
-            font=dict(size=14),
-            title_font_size=18,
-            height=500
-        )
-        return fig
-
-    dff['YEAR_MONTH'] = dff.apply(
-        lambda row: f"{calendar.month_name[row['MONTH_NUM']]} {row['YEAR']}",
-        axis=1
-    )
-
-    daily_group = (
-        dff.groupby(['DAY_OF_MONTH', 'YEAR_MONTH'])
-        .size()
-        .reset_index(name='TOTAL_PAID')
-    )
+        return {'title': title}
 
     max_days = calendar.monthrange(2024, selected_month)[1]
 
-    fig = px.line(
-        daily_group,
-        x='DAY_OF_MONTH',
-        y='TOTAL_PAID',
-        color='YEAR_MONTH',
-        markers=True,
-        labels={
-            'DAY_OF_MONTH': 'Day of Month',
-            'TOTAL_PAID': 'Total Paid Applications',
-            'YEAR_MONTH': 'Period'
-        },
-        title=f"Daily Paid Applications: {calendar.month_name[selected_month]}" +
-              (f" - {selected_region}" if selected_region else "")
-    )
+    return {
+        'title': f"Daily Paid Applications: {calendar.month_name[selected_month]}" +
+                 (f" - {selected_region}" if selected_region else ""),
+        'x_range': [1, max_days],
+        'traces': traces
+    }
 
-    fig.update_layout(
-        xaxis=dict(
-            tickmode='linear',
-            dtick=1,
-            range=[1, max_days],
-            title='Day of Month'
-        ),
-        yaxis_title="Total Paid Applications",
-        plot_bgcolor="white",
-        font=dict(size=12),
-        title_font_size=16,
-        hovermode="x unified",
-        legend_title_text='Period',
-        height=500,
-        margin=dict(l=50, r=50, t=80, b=50)
-    )
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightgray')
+# === Callbacks ===
+@app.callback(
+    Output('trace-data', 'data'),
+    Input('region-filter', 'value'),
+    Input('month-filter', 'value'),
+)
+def update_chart(selected_region, selected_month):
+    return make_chart_data(selected_region, selected_month)
 
-    return fig
+# Only the small trace payload crosses the network; the browser merges it
+# into the stored layout and redraws (see assets/graph.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='graph', function_name='update'),
+    Output('line-chart', 'figure'),
+    Input('trace-data', 'data'),
+    State('chart-layouts', 'data'),
+)
 
 # === Application Entry Point ===
 if __name__ == '__main__':
@@ -0,0 +1,30 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    graph: {
+        // Build the chart figure from the server's trace payload and the
+        // layouts stored with the page, so layouts are never re-sent
+        update: function (traceData, layouts) {
+            if (!traceData || !layouts) {
+                return window.dash_clientside.no_update;
+            }
+
+            var base = traceData.traces ? layouts.base : layouts.message;
+            var layout = JSON.parse(JSON.stringify(base));
+            layout.title = Object.assign({}, layout.title, {text: traceData.title});
+            if (traceData.x_range) {
+                layout.xaxis = Object.assign({}, layout.xaxis, {range: traceData.x_range});
+            }
+
+            var data = (traceData.traces || []).map(function (trace) {
+                return {
+                    type: 'scattergl',
+                    mode: 'lines+markers',
+                    x: trace.x,
+                    y: trace.y,
+                    name: trace.name
+                };
+            });
+
+            return {data: data, layout: layout};
+        }
+    }
+});